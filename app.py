@@ -1,21 +1,35 @@
 #816040436-Micah Hosein-app.py- Dashboard
 import os
+import numpy as np
 import pandas as pd
 import plotly.express as px
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import plotly.graph_objects as go
 import streamlit as st
 
 
 CLEAN_PATH  = "data/cleaned_taxi_data.parquet"
 ZONES_PATH  = "data/raw/taxi_zone_lookup.csv"
 
-PAYMENT_MAP = {
-    1: "Credit Card",
-    2: "Cash",
-    3: "No Charge",
-    4: "Dispute",
-    0: "Unknown",
-    6: "Voided Trip",
-}
+# Indexed by payment_type code (0–6)
+PAYMENT_LABELS = np.array(
+    ["Unknown", "Credit Card", "Cash", "No Charge", "Dispute", "Other", "Voided Trip"],
+    dtype=object,
+)
+
+# The only trip columns the dashboard reads; the rest of the parquet is never loaded
+TRIP_COLUMNS = [
+    "tpep_pickup_datetime",
+    "pickup_hour",
+    "pickup_day_of_week",
+    "PULocationID",
+    "payment_type",
+    "fare_amount",
+    "total_amount",
+    "trip_distance",
+    "trip_duration_minutes",
+]
 
 DAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
@@ -32,89 +46,293 @@ st.set_page_config(
 
 @st.cache_data
 def load_trip_data(path: str) -> pd.DataFrame:
-    df = pd.read_parquet(path)
-
-    for col in ["tpep_pickup_datetime", "tpep_dropoff_datetime"]:
-        df[col] = pd.to_datetime(df[col])
-    df["payment_label"] = df["payment_type"].map(PAYMENT_MAP).fillna("Other")
+    dataset = ds.dataset(
+        path, format="parquet", filesystem=pafs.LocalFileSystem(use_mmap=True)
+    )
+    df = dataset.to_table(columns=TRIP_COLUMNS).to_pandas(self_destruct=True)
+
+    # The notebook writes this as datetime64 already; only convert if it did not
+    if df["tpep_pickup_datetime"].dtype.kind != "M":
+        df["tpep_pickup_datetime"] = pd.to_datetime(df["tpep_pickup_datetime"])
+    # The notebook writes the file pre-sorted; older files still get sorted here
+    if not df["tpep_pickup_datetime"].is_monotonic_increasing:
+        df = df.sort_values("tpep_pickup_datetime", kind="stable", ignore_index=True)
+
+    # Narrow dtypes so every mask and count below streams fewer bytes per row
+    df["payment_type"] = df["payment_type"].astype("int8")
+    df["pickup_hour"] = df["pickup_hour"].astype("int8")
+    df["PULocationID"] = df["PULocationID"].astype("int16")
+    df["pickup_day_of_week"] = pd.Categorical(
+        df["pickup_day_of_week"], categories=DAY_ORDER, ordered=True
+    )
+    df["payment_label"] = pd.Categorical.from_codes(
+        df["payment_type"].clip(0, 6).to_numpy(), categories=PAYMENT_LABELS,
+    )
     return df
 
 
 @st.cache_data
-def load_zone_data(path: str) -> pd.DataFrame:
-    return pd.read_csv(path)
+def load_zone_data(path: str) -> np.ndarray:
+    # Structured array indexed directly by LocationID (row 0 is unused)
+    zones = pd.read_csv(path)
+    lookup = np.zeros(
+        zones["LocationID"].max() + 1, dtype=[("Zone", object), ("Borough", object)]
+    )
+    lookup["Zone"][zones["LocationID"]] = zones["Zone"].to_numpy()
+    lookup["Borough"][zones["LocationID"]] = zones["Borough"].to_numpy()
+    return lookup
 
 
-def apply_filters(
+@st.cache_data
+def load_distance_sample(path: str, n: int = 1_000_000) -> pd.DataFrame:
+    # Only the histogram needs per-trip values, so it draws from a fixed random
+    # sample kept in pickup order (positions are sorted, so searchsorted still works)
+    df = load_trip_data(path)
+    rng = np.random.default_rng(42)
+    rows = np.sort(rng.permutation(len(df))[:n])
+    cols = ["tpep_pickup_datetime", "pickup_hour", "payment_label", "trip_distance"]
+    return df[cols].iloc[rows].reset_index(drop=True)
+
+
+@st.cache_data
+def build_cube(path: str) -> pd.DataFrame:
+    # Every chart and metric except the histogram is a sum over these keys, so
+    # filtering this table replaces filtering the millions of raw trip rows
+    df = load_trip_data(path)
+    return (
+        df.assign(pickup_date=df["tpep_pickup_datetime"].dt.floor("D"))
+        .groupby(
+            ["pickup_date", "pickup_hour", "pickup_day_of_week", "PULocationID", "payment_label"],
+            observed=True,
+        )
+        .agg(
+            trips=("fare_amount", "size"),
+            fare_sum=("fare_amount", "sum"),
+            rev_sum=("total_amount", "sum"),
+            dist_sum=("trip_distance", "sum"),
+            dur_sum=("trip_duration_minutes", "sum"),
+        )
+        .reset_index()
+    )
+
+
+def compute_mask(
     df: pd.DataFrame,
     start_date,
     end_date,
     hour_min: int,
     hour_max: int,
     payment_types: list,
-) -> pd.DataFrame:
-    
-    mask = (
-        (df["tpep_pickup_datetime"].dt.date >= start_date)
-        & (df["tpep_pickup_datetime"].dt.date <= end_date)
-        & (df["pickup_hour"] >= hour_min)
-        & (df["pickup_hour"] <= hour_max)
-    )
+    time_col: str = "tpep_pickup_datetime",
+) -> np.ndarray:
+
+    # Rows are sorted by pickup time, so the date range is a contiguous slice
+    pickup = df[time_col].to_numpy()
+    bounds = np.array(
+        [np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + 1]
+    ).astype(pickup.dtype)
+    lo, hi = np.searchsorted(pickup.view("i8"), bounds.view("i8"))
+
+    hour = df["pickup_hour"].to_numpy()[lo:hi]
+    window = (hour >= hour_min) & (hour <= hour_max)
     if payment_types:
-        mask &= df["payment_label"].isin(payment_types)
-    return df[mask]
+        labels = df["payment_label"].cat
+        codes = labels.categories.get_indexer(payment_types)
+        window &= np.isin(labels.codes.to_numpy()[lo:hi], codes[codes >= 0])
+
+    mask = np.zeros(len(df), dtype=bool)
+    mask[lo:hi] = window
+    return mask
 
 
 # Pre-aggregation helpers 
+# These take the cube from build_cube plus a row mask, so every count is weighted by "trips"
 
-@st.cache_data
-def agg_top_zones(df: pd.DataFrame, zones: pd.DataFrame) -> pd.DataFrame:
+def agg_top_zones(cube: pd.DataFrame, mask: np.ndarray, zones: np.ndarray) -> pd.DataFrame:
+
+    # LocationIDs index straight into the bincount and the zone lookup array
+    counts = np.bincount(
+        cube["PULocationID"].to_numpy()[mask], weights=cube["trips"].to_numpy()[mask],
+        minlength=len(zones),
+    ).astype(np.int64)
+    top_ids = np.argpartition(counts, -10)[-10:]
+    top_ids = top_ids[np.argsort(counts[top_ids])[::-1]]
+    top_ids = top_ids[counts[top_ids] > 0]
 
-    zone_counts = (
-        df.groupby("PULocationID")
-        .size()
-        .reset_index(name="trip_count")
+    return pd.DataFrame({
+        "Zone": zones["Zone"][top_ids],
+        "Borough": zones["Borough"][top_ids],
+        "trip_count": counts[top_ids],
+    })
+
+
+def agg_fare_by_hour(cube: pd.DataFrame, mask: np.ndarray) -> pd.DataFrame:
+
+    hour = cube["pickup_hour"].to_numpy()[mask]
+    sums = np.bincount(hour, weights=cube["fare_sum"].to_numpy()[mask], minlength=24)
+    counts = np.bincount(hour, weights=cube["trips"].to_numpy()[mask], minlength=24)
+    hours = np.flatnonzero(counts)
+    return pd.DataFrame({"pickup_hour": hours, "avg_fare": sums[hours] / counts[hours]})
+
+
+def agg_payment_types(cube: pd.DataFrame, mask: np.ndarray) -> pd.DataFrame:
+
+    labels = cube["payment_label"].cat
+    counts = np.bincount(
+        labels.codes.to_numpy()[mask], weights=cube["trips"].to_numpy()[mask],
+        minlength=len(labels.categories),
+    ).astype(np.int64)
+    codes = np.flatnonzero(counts)
+    return (
+        pd.DataFrame({
+            "payment_label": labels.categories[codes],
+            "trip_count": counts[codes],
+        })
+        .sort_values("trip_count", ascending=False)
     )
-    merged = zone_counts.merge(
-        zones[["LocationID", "Zone", "Borough"]],
-        left_on="PULocationID",
-        right_on="LocationID",
-        how="left",
+
+
+def agg_distance_bins(distances: np.ndarray) -> pd.DataFrame:
+
+    # Bin in NumPy so the browser receives 60 counts rather than every sampled trip
+    counts, edges = np.histogram(distances, bins=60, range=(0, 30))
+    return pd.DataFrame({
+        "trip_distance": 0.5 * (edges[:-1] + edges[1:]),
+        "trip_count": counts,
+    })
+
+
+def _heatmap(dow: np.ndarray, hour: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    # Flatten (day, hour) into a single 0–167 key so one bincount fills the 7×24 grid
+    key = dow.astype(np.intp) * 24 + hour
+    return np.bincount(key, weights=weights, minlength=7 * 24).astype(np.int64).reshape(7, 24)
+
+
+def agg_heatmap(cube: pd.DataFrame, mask: np.ndarray) -> np.ndarray:
+
+    return _heatmap(
+        cube["pickup_day_of_week"].cat.codes.to_numpy()[mask],
+        cube["pickup_hour"].to_numpy()[mask],
+        cube["trips"].to_numpy()[mask],
     )
-    return merged.nlargest(10, "trip_count")[["Zone", "Borough", "trip_count"]]
 
 
+# Filter + aggregate 
+
 @st.cache_data
-def agg_fare_by_hour(df: pd.DataFrame) -> pd.DataFrame:
-   
+def summarise(
+    path: str,
+    zones_path: str,
+    start_date,
+    end_date,
+    hour_min: int,
+    hour_max: int,
+    payment_types: list,
+) -> tuple:
+    # Cached on the paths and filter values only, so Streamlit never hashes the big frames
+    cube = build_cube(path)
+    mask = compute_mask(
+        cube, start_date, end_date, hour_min, hour_max, payment_types, time_col="pickup_date"
+    )
+    # One reduction over the filtered cube feeds all five metrics
+    totals = cube.loc[mask, ["trips", "fare_sum", "rev_sum", "dist_sum", "dur_sum"]].sum()
+
+    sample = load_distance_sample(path)
+    distances = sample["trip_distance"].to_numpy()[
+        compute_mask(sample, start_date, end_date, hour_min, hour_max, payment_types)
+    ]
+    sample_size = min(200_000, len(distances))
+    distances = np.random.default_rng(42).choice(distances, size=sample_size, replace=False)
+
     return (
-        df.groupby("pickup_hour")["fare_amount"]
-        .mean()
-        .reset_index()
-        .rename(columns={"fare_amount": "avg_fare"})
-        .sort_values("pickup_hour")
+        totals,
+        agg_top_zones(cube, mask, load_zone_data(zones_path)),
+        agg_fare_by_hour(cube, mask),
+        agg_distance_bins(distances),
+        agg_payment_types(cube, mask),
+        agg_heatmap(cube, mask),
     )
 
 
+# Figure builders 
+# Cached on the small aggregated frames, so an unchanged chart skips Plotly entirely
+
 @st.cache_data
-def agg_payment_types(df: pd.DataFrame) -> pd.DataFrame:
-   
-    return (
-        df.groupby("payment_label")
-        .size()
-        .reset_index(name="trip_count")
-        .sort_values("trip_count", ascending=False)
+def fig_top_zones(top_zones: pd.DataFrame) -> go.Figure:
+    fig = px.bar(
+        top_zones.sort_values("trip_count"),
+        x="trip_count", y="Zone",
+        orientation="h",
+        color="trip_count",
+        color_continuous_scale="Blues",
+        labels={"trip_count": "Number of Trips", "Zone": "Pickup Zone"},
+        title="Top 10 Busiest Pickup Zones",
     )
+    fig.update_coloraxes(showscale=False)
+    return fig
 
 
 @st.cache_data
-def agg_heatmap(df: pd.DataFrame) -> pd.DataFrame:
-   
-    return (
-        df.groupby(["pickup_day_of_week", "pickup_hour"])
-        .size()
-        .reset_index(name="trip_count")
+def fig_fare_by_hour(fare_by_hour: pd.DataFrame) -> go.Figure:
+    fig = px.line(
+        fare_by_hour,
+        x="pickup_hour", y="avg_fare",
+        markers=True,
+        labels={"pickup_hour": "Hour of Day (0–23)", "avg_fare": "Avg Fare ($)"},
+        title="Average Fare by Hour",
     )
+    fig.update_xaxes(dtick=1)
+    return fig
+
+
+@st.cache_data
+def fig_distance_histogram(distance_bins: pd.DataFrame) -> go.Figure:
+    fig = go.Figure(go.Bar(
+        x=distance_bins["trip_distance"],
+        y=distance_bins["trip_count"],
+        width=0.5,
+        marker_color="#636EFA",
+        hovertemplate="Distance (miles)=%{x}<br>Number of Trips=%{y}<extra></extra>",
+    ))
+    fig.update_layout(
+        title="Distribution of Trip Distances (0–30 miles)",
+        xaxis_title="Distance (miles)",
+        yaxis_title="Number of Trips",
+        xaxis_range=[0, 30],
+    )
+    return fig
+
+
+@st.cache_data
+def fig_payment_types(payment_counts: pd.DataFrame) -> go.Figure:
+    fig = px.pie(
+        payment_counts,
+        names="payment_label",
+        values="trip_count",
+        title="Share of Trips by Payment Type",
+        hole=0.4,
+    )
+    fig.update_traces(textposition="inside", textinfo="percent+label")
+    return fig
+
+
+@st.cache_data
+def fig_heatmap(grid: np.ndarray) -> go.Figure:
+    # The grid is already binned, so Plotly.js only has to paint 7×24 cells
+    fig = go.Figure(go.Heatmap(
+        z=grid,
+        x=np.arange(24),
+        y=DAY_ORDER,
+        colorscale="YlOrRd",
+        colorbar={"title": {"text": "Trip Count"}},
+        hovertemplate="Day of Week=%{y}<br>Hour of Day=%{x}<br>Trip Count=%{z}<extra></extra>",
+    ))
+    fig.update_layout(
+        title="Heatmap: Trips by Day of Week and Hour",
+        xaxis_title="Hour of Day",
+        yaxis_title="Day of Week",
+    )
+    return fig
 
 
 # Main 
@@ -128,7 +346,7 @@ def main():
         st.stop()
 
     df_full  = load_trip_data(CLEAN_PATH)
-    df_zones = load_zone_data(ZONES_PATH)
+    cube = build_cube(CLEAN_PATH)
 
     # Title and intro
     st.title("🚕 NYC Yellow Taxi Trip Dashboard")
@@ -142,8 +360,8 @@ def main():
     st.sidebar.header("Filters")
 
     # Date range
-    min_date = df_full["tpep_pickup_datetime"].dt.date.min()
-    max_date = df_full["tpep_pickup_datetime"].dt.date.max()
+    min_date = df_full["tpep_pickup_datetime"].iloc[0].date()
+    max_date = df_full["tpep_pickup_datetime"].iloc[-1].date()
     date_range = st.sidebar.date_input(
         "Date Range",
         value=(min_date, max_date),
@@ -169,7 +387,7 @@ def main():
 
 
     # Payment type multi-select
-    all_payment_types = sorted(df_full["payment_label"].dropna().unique().tolist())
+    all_payment_types = sorted(cube["payment_label"].unique().tolist())
 
     selected_payments = st.sidebar.multiselect(
         "Payment Types",
@@ -179,21 +397,26 @@ def main():
 
 
     # Applying filters
-    df = apply_filters(df_full, start_date, end_date, hour_min, hour_max, selected_payments)
+    (
+        totals, top_zones, fare_by_hour, distance_bins, payment_counts, heatmap_grid,
+    ) = summarise(
+        CLEAN_PATH, ZONES_PATH, start_date, end_date, hour_min, hour_max, selected_payments
+    )
 
-    if df.empty:
+    if totals["trips"] == 0:
         st.warning("No data matches the current filters. Please adjust the sidebar.")
         st.stop()
 
 
     # Key metrics 
+    trips = int(totals["trips"])
     st.subheader("Key Metrics")
     m1, m2, m3, m4, m5 = st.columns(5)
-    m1.metric("Total Trips",        f"{len(df):,}")
-    m2.metric("Avg Fare",           f"${df['fare_amount'].mean():.2f}")
-    m3.metric("Total Revenue",      f"${df['total_amount'].sum():,.0f}")
-    m4.metric("Avg Trip Distance",  f"{df['trip_distance'].mean():.2f} mi")
-    m5.metric("Avg Trip Duration",  f"{df['trip_duration_minutes'].mean():.1f} min")
+    m1.metric("Total Trips",        f"{trips:,}")
+    m2.metric("Avg Fare",           f"${totals['fare_sum'] / trips:.2f}")
+    m3.metric("Total Revenue",      f"${totals['rev_sum']:,.0f}")
+    m4.metric("Avg Trip Distance",  f"{totals['dist_sum'] / trips:.2f} mi")
+    m5.metric("Avg Trip Duration",  f"{totals['dur_sum'] / trips:.1f} min")
 
     st.divider()
 
@@ -201,19 +424,7 @@ def main():
 
     # Visualisation 1 — Top 10 Pickup Zones 
     st.subheader("(1) Top 10 Pickup Zones")
-    top_zones = agg_top_zones(df, df_zones)
-
-    fig1 = px.bar(
-        top_zones.sort_values("trip_count"),
-        x="trip_count", y="Zone",
-        orientation="h",
-        color="trip_count",
-        color_continuous_scale="Blues",
-        labels={"trip_count": "Number of Trips", "Zone": "Pickup Zone"},
-        title="Top 10 Busiest Pickup Zones",
-    )
-
-    fig1.update_coloraxes(showscale=False)
+    fig1 = fig_top_zones(top_zones)
     st.plotly_chart(fig1, use_container_width=True)
     st.caption(
         "Midtown Center and Upper East Side South lead all zones with over 140,000 trips each, " 
@@ -227,17 +438,7 @@ def main():
 
     # Visualisation 2 — Average Fare by Hour
     st.subheader("(2) Average Fare by Hour of Day")
-    fare_by_hour = agg_fare_by_hour(df)
-
-    fig2 = px.line(
-        fare_by_hour,
-        x="pickup_hour", y="avg_fare",
-        markers=True,
-        labels={"pickup_hour": "Hour of Day (0–23)", "avg_fare": "Avg Fare ($)"},
-        title="Average Fare by Hour",
-    )
-
-    fig2.update_xaxes(dtick=1)
+    fig2 = fig_fare_by_hour(fare_by_hour)
     st.plotly_chart(fig2, use_container_width=True)
     st.caption(
         "The sharp spike at 5 AM is driven by early morning airport runs " 
@@ -250,17 +451,7 @@ def main():
 
     # Visualisation 3 — Trip Distance Distribution 
     st.subheader("(3) Trip Distance Distribution")
-    sample_size = min(200_000, len(df))
-    df_sample = df.sample(n=sample_size, random_state=42)
-    fig3 = px.histogram(
-        df_sample,
-        x="trip_distance",
-        nbins=60,
-        range_x=[0, 30],
-        labels={"trip_distance": "Distance (miles)", "count": "Number of Trips"},
-        title="Distribution of Trip Distances (0–30 miles)",
-        color_discrete_sequence=["#636EFA"],
-    )
+    fig3 = fig_distance_histogram(distance_bins)
     st.plotly_chart(fig3, use_container_width=True)
     st.caption(
         "The vast majority of trips fall under 3 miles, confirming that NYC taxis are primarily " 
@@ -273,17 +464,7 @@ def main():
 
     # Visualisation 4 — Payment Type Breakdown 
     st.subheader("(4) Payment Type Breakdown")
-    payment_counts = agg_payment_types(df)
-
-    fig4 = px.pie(
-        payment_counts,
-        names="payment_label",
-        values="trip_count",
-        title="Share of Trips by Payment Type",
-        hole=0.4,
-    )
-
-    fig4.update_traces(textposition="inside", textinfo="percent+label")
+    fig4 = fig_payment_types(payment_counts)
     st.plotly_chart(fig4, use_container_width=True)
     st.caption(
         "Credit card dominates at 80.1%, reflecting the mandatory card reader requirement in NYC " 
@@ -296,22 +477,7 @@ def main():
 
     # Visualisation 5 — Trips by Day of Week × Hour (Heatmap) 
     st.subheader("(5) Trip Volume by Day of Week and Hour")
-    heatmap_data = agg_heatmap(df)
-
-    fig5 = px.density_heatmap(
-        heatmap_data,
-        x="pickup_hour",
-        y="pickup_day_of_week",
-        z="trip_count",
-        category_orders={"pickup_day_of_week": DAY_ORDER},
-        color_continuous_scale="YlOrRd",
-        labels={
-            "pickup_hour": "Hour of Day",
-            "pickup_day_of_week": "Day of Week",
-            "trip_count": "Trip Count",
-        },
-        title="Heatmap: Trips by Day of Week and Hour",
-    )
+    fig5 = fig_heatmap(heatmap_grid)
 
     st.plotly_chart(fig5, use_container_width=True)
     st.caption(